@@ -22,14 +22,18 @@ from __future__ import annotations
 import re
 import json
 from dataclasses import dataclass, field, asdict
-from typing import Optional
+from typing import Optional, Sequence
 
-# optional fuzzy matching — falls back gracefully if library absent
+# optional fuzzy matching — rapidfuzz is imported lazily by _get_fuzz() on the
+# first query that actually needs it, and falls back gracefully if absent
+_fuzz_mod = None   # None = not tried yet, False = unavailable, else (process, fuzz)
+
+# optional fast JSON writer — falls back to the stdlib json module
 try:
-    from rapidfuzz import process as fuzz_process, fuzz
-    _FUZZY = True
+    import orjson
+    _ORJSON = True
 except ImportError:
-    _FUZZY = False
+    _ORJSON = False
 
 # Stub for streamlit cache when running outside streamlit
 try:
@@ -47,68 +51,109 @@ except ImportError:
 #  ENTITY VOCABULARY
 # ══════════════════════════════════════════════════════════════════════════
 
-STATES = [
+STATES = (
     "Andhra Pradesh", "Delhi", "Gujarat", "Karnataka", "Maharashtra",
     "Rajasthan", "Tamil Nadu", "Telangana", "Uttar Pradesh", "West Bengal",
-]
-BANKS      = ["Axis", "HDFC", "ICICI", "IndusInd", "Kotak", "PNB", "SBI", "Yes Bank"]
-CATEGORIES = [
+)
+BANKS      = ("Axis", "HDFC", "ICICI", "IndusInd", "Kotak", "PNB", "SBI", "Yes Bank")
+CATEGORIES = (
     "Education", "Entertainment", "Food", "Fuel", "Grocery",
     "Healthcare", "Other", "Shopping", "Transport", "Utilities",
-]
-AGE_GROUPS = ["18-25", "26-35", "36-45", "46-55", "56+"]
-DEVICES    = ["Android", "iOS", "Web"]
-NETWORKS   = ["3G", "4G", "5G", "WiFi"]
-TXN_TYPES  = ["P2P", "P2M", "Bill Payment", "Recharge"]
+)
+AGE_GROUPS = ("18-25", "26-35", "36-45", "46-55", "56+")
+DEVICES    = ("Android", "iOS", "Web")
+NETWORKS   = ("3G", "4G", "5G", "WiFi")
+TXN_TYPES  = ("P2P", "P2M", "Bill Payment", "Recharge")
+
+_STATES_LOWER = tuple(s.lower() for s in STATES)
+
+# words shorter than this cannot score 80 against any state name (all ≥ 5
+# chars), so they are skipped before reaching rapidfuzz
+_FUZZY_MIN_LEN = 4
 
 # ── keyword → canonical dimension name ──────────────────────────────────
-DIM_KEYWORDS: dict[str, list[str]] = {
-    "device_type":       ["device", "android", "ios", "web", "mobile", "browser", "platform"],
-    "network_type":      ["network", "5g", "4g", "3g", "wifi", "wi-fi", "connectivity", "connection"],
-    "sender_state":      ["state", "region", "city", "location", "geography"],
-    "sender_bank":       ["bank", "lender", "provider", "financial institution"],
-    "merchant_category": ["category", "sector", "merchant", "industry", "type of purchase", "spend category"],
-    "sender_age_group":  ["age", "age group", "demographic", "generation", "young", "senior", "millennial"],
-    "day_of_week":       ["day", "weekday", "weekend", "monday", "tuesday", "wednesday",
-                          "thursday", "friday", "saturday", "sunday"],
-    "hour_of_day":       ["hour", "time", "peak hour", "morning", "afternoon", "evening",
-                          "night", "midnight", "clock"],
-    "transaction_type":  ["transaction type", "p2p", "p2m", "bill payment", "recharge",
-                          "mode", "payment type"],
-    "month":             ["month", "monthly", "january", "february", "march", "april", "may",
-                          "june", "july", "august", "september", "october", "november", "december"],
+DIM_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "device_type":       ("device", "android", "ios", "web", "mobile", "browser", "platform"),
+    "network_type":      ("network", "5g", "4g", "3g", "wifi", "wi-fi", "connectivity", "connection"),
+    "sender_state":      ("state", "region", "city", "location", "geography"),
+    "sender_bank":       ("bank", "lender", "provider", "financial institution"),
+    "merchant_category": ("category", "sector", "merchant", "industry", "type of purchase", "spend category"),
+    "sender_age_group":  ("age", "age group", "demographic", "generation", "young", "senior", "millennial"),
+    "day_of_week":       ("day", "weekday", "weekend", "monday", "tuesday", "wednesday",
+                          "thursday", "friday", "saturday", "sunday"),
+    "hour_of_day":       ("hour", "time", "peak hour", "morning", "afternoon", "evening",
+                          "night", "midnight", "clock"),
+    "transaction_type":  ("transaction type", "p2p", "p2m", "bill payment", "recharge",
+                          "mode", "payment type"),
+    "month":             ("month", "monthly", "january", "february", "march", "april", "may",
+                          "june", "july", "august", "september", "october", "november", "december"),
 }
 
 # ── keyword → canonical metric name ─────────────────────────────────────
-METRIC_KEYWORDS: dict[str, list[str]] = {
-    "fraud_rate":   ["fraud", "fraudulent", "scam", "flag", "flagged", "suspicious", "risk"],
-    "failure_rate": ["fail", "failure", "failed", "decline", "declined", "unstable",
-                     "unsuccessful", "error", "drop", "dropout", "bounce"],
-    "avg_amount":   ["average", "avg", "mean", "typical", "usual", "standard amount", "transaction size"],
-    "count":        ["count", "volume", "number", "how many", "total transaction",
-                     "frequency", "most used", "popular", "busiest"],
-    "total_volume": ["total amount", "total value", "revenue", "sum", "aggregate", "cumulative"],
+METRIC_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "fraud_rate":   ("fraud", "fraudulent", "scam", "flag", "flagged", "suspicious", "risk"),
+    "failure_rate": ("fail", "failure", "failed", "decline", "declined", "unstable",
+                     "unsuccessful", "error", "drop", "dropout", "bounce"),
+    "avg_amount":   ("average", "avg", "mean", "typical", "usual", "standard amount", "transaction size"),
+    "count":        ("count", "volume", "number", "how many", "total transaction",
+                     "frequency", "most used", "popular", "busiest"),
+    "total_volume": ("total amount", "total value", "revenue", "sum", "aggregate", "cumulative"),
 }
 
 # ── intent keywords ──────────────────────────────────────────────────────
-INTENT_KEYWORDS: dict[str, list[str]] = {
-    "trend":      ["trend", "over time", "monthly", "weekly", "daily", "by month", "by week",
+INTENT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "trend":      ("trend", "over time", "monthly", "weekly", "daily", "by month", "by week",
                    "by day", "by hour", "time series", "timeline", "pattern", "seasonal",
-                   "growth", "decline", "change"],
-    "ranking":    ["top", "bottom", "best", "worst", "highest", "lowest", "rank", "ranking",
+                   "growth", "decline", "change"),
+    "ranking":    ("top", "bottom", "best", "worst", "highest", "lowest", "rank", "ranking",
                    "most", "least", "which.*most", "which.*least", "who has", "who is",
-                   "maximum", "minimum"],
-    "comparison": ["compare", "vs", "versus", "against", "difference between", "contrast",
+                   "maximum", "minimum"),
+    "comparison": ("compare", "vs", "versus", "against", "difference between", "contrast",
                    "between", "across", "each", "per", "by device", "by bank",
-                   "by state", "by category"],
-    "anomaly":    ["anomal", "outlier", "unusual", "spike", "abnormal", "sudden", "unexpected"],
-    "single":     ["what is", "what's", "show", "tell me", "give me", "display",
-                   "overall", "total", "summary", "overview"],
+                   "by state", "by category"),
+    "anomaly":    ("anomal", "outlier", "unusual", "spike", "abnormal", "sudden", "unexpected"),
+    "single":     ("what is", "what's", "show", "tell me", "give me", "display",
+                   "overall", "total", "summary", "overview"),
+}
+
+# flattened (keyword, label) tables — built once, scanned by _score_keywords()
+_INTENT_TABLE = tuple((kw, label) for label, kws in INTENT_KEYWORDS.items() for kw in kws)
+_METRIC_TABLE = tuple((kw, label) for label, kws in METRIC_KEYWORDS.items() for kw in kws)
+_DIM_TABLE    = tuple((kw, label) for label, kws in DIM_KEYWORDS.items()    for kw in kws)
+
+# confidence and reasoning of a query with no intent/metric/group-by keyword hits
+_BASELINE_CONF      = round((0.5 + 0.4 + 0.5) / 3, 2)
+_BASELINE_REASONING = "Intent='single' (conf 50%) | Metric='count' (conf 40%) | No group-by detected"
+
+_ALL_KEYWORDS   = tuple(kw for kw, _ in _INTENT_TABLE + _METRIC_TABLE + _DIM_TABLE)
+# keywords short enough to appear inside a query under 3 characters ("vs", "5g")
+_SHORT_KEYWORDS = tuple(kw for kw in _ALL_KEYWORDS if len(kw) < 3)
+
+# bare entity name → (filter column, canonical value); lets parse_query skip
+# keyword detection for one-entity queries like "SBI" or "Karnataka". Names
+# containing a keyword ("Yes Bank", "iOS", "5G", "P2P") are left out, since
+# the full pipeline gives them a group-by and comparison intent.
+_TRIVIAL_LOOKUP: dict[str, tuple[str, str]] = {
+    name.lower(): (dim, name)
+    for dim, names in (
+        ("sender_state",      STATES),
+        ("sender_bank",       BANKS),
+        ("merchant_category", CATEGORIES),
+        ("device_type",       DEVICES),
+        ("network_type",      NETWORKS),
+        ("transaction_type",  TXN_TYPES),
+    )
+    for name in names
+    if not any(kw in name.lower() for kw in _ALL_KEYWORDS)
 }
 
 # ── sort direction ───────────────────────────────────────────────────────
-ASCENDING_KW  = ["lowest", "least", "bottom", "worst", "minimum", "min"]
-DESCENDING_KW = ["highest", "most", "top", "best", "maximum", "max"]
+ASCENDING_KW  = frozenset({"lowest", "least", "bottom", "worst", "minimum", "min"})
+DESCENDING_KW = frozenset({"highest", "most", "top", "best", "maximum", "max"})
+
+# whole words that force ranking intent (phrase "who has" is checked separately)
+RANKING_KW = frozenset({"top", "bottom", "rank", "ranking", "highest", "lowest",
+                        "best", "worst", "which", "most", "least"})
 
 # ── time-window keywords ─────────────────────────────────────────────────
 TIME_KEYWORDS = {
@@ -123,7 +168,7 @@ TIME_KEYWORDS = {
 
 MONTH_MAP = {
     "jan": 1,  "feb": 2,  "mar": 3,  "apr": 4,  "may": 5,  "jun": 6,
-    "jul": 7,  "aug": 8,  "sep": 9,  "oct": 10, "nov": 11, "dec": 12,
+    "jul": 7,  "aug": 8,  "sep": 9,  "sept": 9, "oct": 10, "nov": 11, "dec": 12,
     "january": 1, "february": 2, "march": 3,     "april": 4,
     "june": 6,    "july": 7,    "august": 8,     "september": 9,
     "october": 10,"november": 11,"december": 12,
@@ -150,6 +195,8 @@ class AnalyticalQuery:
     compare:              list           = field(default_factory=list)
 
     def to_json(self) -> str:
+        if _ORJSON:
+            return orjson.dumps(self, option=orjson.OPT_INDENT_2).decode()
         return json.dumps(asdict(self), indent=2, ensure_ascii=False)
 
 
@@ -162,13 +209,35 @@ def _tok(text: str) -> str:
     return re.sub(r"[^\w\s\-\+]", " ", text.lower()).strip()
 
 
-def _any_kw(text: str, kws: list[str]) -> bool:
-    return any(kw in text for kw in kws)
+_WORD_RE = re.compile(r"[a-z0-9]+")
 
 
-def _fuzzy_resolve(query_token: str, candidates: list[str], threshold: int = 72) -> Optional[str]:
-    if not _FUZZY or not query_token:
+def _any_word(tok: str, words: frozenset[str]) -> bool:
+    """True when any whole word of the tokenised text is in `words`.
+
+    Words are split on hyphens too, so "bottom-3" and "lowest-fraud" match."""
+    return not words.isdisjoint(_WORD_RE.findall(tok))
+
+
+def _get_fuzz():
+    """Import rapidfuzz on first use; returns (process, fuzz) or False."""
+    global _fuzz_mod
+    if _fuzz_mod is None:
+        try:
+            from rapidfuzz import process, fuzz
+            _fuzz_mod = (process, fuzz)
+        except ImportError:
+            _fuzz_mod = False
+    return _fuzz_mod
+
+
+def _fuzzy_resolve(query_token: str, candidates: Sequence[str], threshold: int = 72) -> Optional[str]:
+    if len(query_token) < _FUZZY_MIN_LEN:
+        return None
+    fuzz_mod = _get_fuzz()
+    if not fuzz_mod:
         return None
+    fuzz_process, fuzz = fuzz_mod
     result = fuzz_process.extractOne(query_token, candidates, scorer=fuzz.token_sort_ratio)
     if result and result[1] >= threshold:
         return result[0]
@@ -186,43 +255,37 @@ def _extract_top_n(text: str) -> int:
 #  CORE PARSING FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════
 
-def _detect_intent(text: str) -> tuple[str, float]:
+def _score_keywords(text: str, table: tuple[tuple[str, str], ...]) -> tuple[Optional[str], int]:
+    """Single pass over a flattened keyword table; returns (best label, hit count)."""
     scores: dict[str, int] = {}
-    for intent, kws in INTENT_KEYWORDS.items():
-        hit = sum(1 for kw in kws if kw in text)
-        if hit:
-            scores[intent] = hit
+    for kw, label in table:
+        if kw in text:
+            scores[label] = scores.get(label, 0) + 1
     if not scores:
-        return "single", 0.5
+        return None, 0
     best = max(scores, key=scores.get)
-    conf = min(0.95, 0.6 + scores[best] * 0.1)
-    return best, conf
+    return best, scores[best]
+
+
+def _detect_intent(text: str) -> tuple[str, float]:
+    best, hits = _score_keywords(text, _INTENT_TABLE)
+    if best is None:
+        return "single", 0.5
+    return best, min(0.95, 0.6 + hits * 0.1)
 
 
 def _detect_metric(text: str) -> tuple[str, float]:
-    scores: dict[str, int] = {}
-    for metric, kws in METRIC_KEYWORDS.items():
-        hit = sum(1 for kw in kws if kw in text)
-        if hit:
-            scores[metric] = hit
-    if not scores:
+    best, hits = _score_keywords(text, _METRIC_TABLE)
+    if best is None:
         return "count", 0.4
-    best = max(scores, key=scores.get)
-    conf = min(0.95, 0.65 + scores[best] * 0.1)
-    return best, conf
+    return best, min(0.95, 0.65 + hits * 0.1)
 
 
 def _detect_groupby(text: str) -> tuple[Optional[str], float]:
-    scores: dict[str, int] = {}
-    for dim, kws in DIM_KEYWORDS.items():
-        hit = sum(1 for kw in kws if kw in text)
-        if hit:
-            scores[dim] = hit
-    if not scores:
+    best, hits = _score_keywords(text, _DIM_TABLE)
+    if best is None:
         return None, 0.0
-    best = max(scores, key=scores.get)
-    conf = min(0.95, 0.6 + scores[best] * 0.1)
-    return best, conf
+    return best, min(0.95, 0.6 + hits * 0.1)
 
 
 def _detect_filters(raw: str, tok: str) -> dict:
@@ -233,11 +296,11 @@ def _detect_filters(raw: str, tok: str) -> dict:
         if s.lower() in tok:
             filters["sender_state"] = s
             break
-    if "sender_state" not in filters and _FUZZY:
+    if "sender_state" not in filters:
         for word in tok.split():
-            match = _fuzzy_resolve(word, [s.lower() for s in STATES], 80)
+            match = _fuzzy_resolve(word, _STATES_LOWER, 80)
             if match:
-                filters["sender_state"] = STATES[[s.lower() for s in STATES].index(match)]
+                filters["sender_state"] = STATES[_STATES_LOWER.index(match)]
                 break
 
     # Bank
@@ -291,18 +354,23 @@ def _detect_filters(raw: str, tok: str) -> dict:
     elif "weekday" in tok:
         filters["is_weekend"] = 0
 
-    # Month
-    for mname, mnum in MONTH_MAP.items():
-        if mname in tok:
-            filters["month_num"] = mnum
+    # Month — whole-word lookup, so "summary" no longer matches "mar"
+    for word in _WORD_RE.findall(tok):
+        month = MONTH_MAP.get(word.removesuffix("s"))
+        if month is not None:
+            filters["month_num"] = month
             break
 
     return filters
 
 
 def _detect_time_window(tok: str) -> Optional[dict]:
-    for label, val in TIME_KEYWORDS.items():
-        if label in tok:
+    # Whole words, split on hyphens ("late-night") with a plural "s" dropped
+    # ("mornings", "weekends"); "midnight" no longer matches "night"
+    for word in _WORD_RE.findall(tok):
+        label = word.removesuffix("s")
+        val   = TIME_KEYWORDS.get(label)
+        if val is not None:
             if isinstance(val, tuple):
                 return {"type": "hour_range", "label": label, "min": val[0], "max": val[1]}
             else:
@@ -312,7 +380,7 @@ def _detect_time_window(tok: str) -> Optional[dict]:
 
 def _detect_sort(tok: str) -> bool:
     """True = ascending (lowest/worst queries)."""
-    return _any_kw(tok, ASCENDING_KW)
+    return _any_word(tok, ASCENDING_KW)
 
 
 def _detect_compare_values(tok: str) -> list[str]:
@@ -361,6 +429,25 @@ def parse_query(raw_query: str, context_hint: str = "") -> AnalyticalQuery:
     """
     tok = _tok(raw_query)
 
+    # ── Early exits ───────────────────────────────────────────────────────
+    # A bare entity name only sets a filter — no keyword detection needed.
+    # Both return exactly what the full pipeline would for the same input.
+    if tok in _TRIVIAL_LOOKUP:
+        dim, val = _TRIVIAL_LOOKUP[tok]
+        filters  = {dim: val}
+        return AnalyticalQuery(
+            filters              = filters,
+            confidence           = _BASELINE_CONF,
+            confidence_reasoning = f"{_BASELINE_REASONING} | Filters={filters}",
+            raw_query            = raw_query,
+        )
+    if len(tok) < 3 and not any(kw in tok for kw in _SHORT_KEYWORDS):
+        return AnalyticalQuery(
+            confidence           = _BASELINE_CONF,
+            confidence_reasoning = _BASELINE_REASONING,
+            raw_query            = raw_query,
+        )
+
     intent, intent_conf  = _detect_intent(tok)
     metric, metric_conf  = _detect_metric(tok)
     group_by, group_conf = _detect_groupby(tok)
@@ -418,8 +505,7 @@ def parse_query(raw_query: str, context_hint: str = "") -> AnalyticalQuery:
         intent = "trend"
     if group_by and intent == "single":
         intent = "comparison"
-    if _any_kw(tok, ["top", "bottom", "rank", "highest", "lowest", "best", "worst",
-                     "which", "who has", "most", "least"]):
+    if _any_word(tok, RANKING_KW) or "who has" in tok:
         if intent not in ("trend",):
             intent = "ranking"
     if "vs" in tok or "versus" in tok or "compare" in tok:
@@ -5,8 +5,12 @@ Converts an AnalyticsResult into a structured InsightResponse.
 """
 
 from __future__ import annotations
+from bisect import bisect_right
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain, islice
 from typing import Optional
+import numpy as np
 import pandas as pd
 
 from src.analytics_engine import AnalyticsResult, METRIC_AGG, _fmt_value, DIM_LABELS
@@ -16,7 +20,7 @@ from src.analytics_engine import AnalyticsResult, METRIC_AGG, _fmt_value, DIM_LA
 #  DATA CLASS
 # ══════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class InsightResponse:
     headline:        str       = ""
     narrative:       str       = ""
@@ -35,30 +39,43 @@ class InsightResponse:
 #  RISK FLAGS
 # ══════════════════════════════════════════════════════════════════════════
 
-def _compute_risk_flags(result: AnalyticsResult) -> list[str]:
+_RISK_METRICS = frozenset({"fraud_rate", "failure_rate"})
+
+_ANOM_DIR = {"high": "significantly above", "low": "significantly below"}
+
+
+def _compute_risk_flags(result: AnalyticsResult, vals: Optional[np.ndarray]) -> list[str]:
+    # Only fraud/failure rates have thresholds; other metrics can flag anomalies only
+    if result.metric not in _RISK_METRICS and not result.anomalies:
+        return []
+
     flags = []
     df    = result.result_df
 
     if result.metric == "fraud_rate":
         if result.scalar_value and result.scalar_value > 0.3:
             flags.append("🚨 Critical: Overall fraud rate exceeds 0.3% — immediate investigation recommended.")
-        if df is not None and result.group_by and result.group_by in df.columns:
-            for _, row in df[df["value"] > 0.25].iterrows():
-                grp = row[result.group_by]
-                flags.append(f"⚠ {grp} fraud rate {_fmt_value(row['value'], 'fraud_rate')} — above threshold.")
+        if vals is not None and result.group_by and result.group_by in df.columns:
+            mask = vals > 0.25
+            flags.extend(
+                f"⚠ {grp} fraud rate {_fmt_value(v, 'fraud_rate')} — above threshold."
+                for grp, v in zip(df[result.group_by].to_numpy()[mask], vals[mask])
+            )
 
     elif result.metric == "failure_rate":
         if result.scalar_value and result.scalar_value > 6.0:
             flags.append("🚨 Critical: Failure rate above 6% — SLA breach risk.")
-        if df is not None and result.group_by and result.group_by in df.columns:
-            for _, row in df[df["value"] > 5.5].iterrows():
-                grp = row[result.group_by]
-                flags.append(f"⚠ {grp} failure rate {_fmt_value(row['value'], 'failure_rate')} — exceeds 5.5% benchmark.")
-
-    if result.anomalies:
-        for a in result.anomalies[:3]:
-            direction = "significantly above" if a["direction"] == "high" else "significantly below"
-            flags.append(f"📊 {a['group']} is {direction} average (z={a['z_score']:+.2f}).")
+        if vals is not None and result.group_by and result.group_by in df.columns:
+            mask = vals > 5.5
+            flags.extend(
+                f"⚠ {grp} failure rate {_fmt_value(v, 'failure_rate')} — exceeds 5.5% benchmark."
+                for grp, v in zip(df[result.group_by].to_numpy()[mask], vals[mask])
+            )
+
+    flags.extend(
+        f"📊 {a['group']} is {_ANOM_DIR.get(a['direction'], 'different from')} average (z={a['z_score']:+.2f})."
+        for a in islice(result.anomalies, 3)
+    )
 
     return flags
 
@@ -67,32 +84,34 @@ def _compute_risk_flags(result: AnalyticsResult) -> list[str]:
 #  RECOMMENDATIONS
 # ══════════════════════════════════════════════════════════════════════════
 
+_RECS: dict[str, tuple[str, ...]] = {
+    "fraud_rate": (
+        "Implement velocity checks for high-fraud network/device combinations.",
+        "Add step-up authentication for transactions in peak fraud hours (1–3 AM).",
+        "Flag transactions from high-fraud states for manual review queues.",
+    ),
+    "failure_rate": (
+        "Prioritise reliability improvements for 3G users — consider retry logic.",
+        "Investigate Web browser failures — may indicate session timeout issues.",
+        "Set up real-time failure rate alerts by network type.",
+    ),
+    "avg_amount": (
+        "Apply tiered transaction limits based on merchant category risk profile.",
+        "High-value categories (Education, Shopping) warrant enhanced KYC checks.",
+    ),
+    "count": (
+        "Align customer support staffing with peak transaction hours.",
+        "Optimise infrastructure capacity for high-volume states and devices.",
+    ),
+    "total_volume": (
+        "Prioritise payment infrastructure in high-volume states.",
+        "Review settlement processes for top-volume merchant categories.",
+    ),
+}
+
+
 def _compute_recommendations(result: AnalyticsResult) -> list[str]:
-    recs = {
-        "fraud_rate": [
-            "Implement velocity checks for high-fraud network/device combinations.",
-            "Add step-up authentication for transactions in peak fraud hours (1–3 AM).",
-            "Flag transactions from high-fraud states for manual review queues.",
-        ],
-        "failure_rate": [
-            "Prioritise reliability improvements for 3G users — consider retry logic.",
-            "Investigate Web browser failures — may indicate session timeout issues.",
-            "Set up real-time failure rate alerts by network type.",
-        ],
-        "avg_amount": [
-            "Apply tiered transaction limits based on merchant category risk profile.",
-            "High-value categories (Education, Shopping) warrant enhanced KYC checks.",
-        ],
-        "count": [
-            "Align customer support staffing with peak transaction hours.",
-            "Optimise infrastructure capacity for high-volume states and devices.",
-        ],
-        "total_volume": [
-            "Prioritise payment infrastructure in high-volume states.",
-            "Review settlement processes for top-volume merchant categories.",
-        ],
-    }
-    return recs.get(result.metric, [])[:2]
+    return list(_RECS.get(result.metric, ())[:2])
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -100,11 +119,60 @@ def _compute_recommendations(result: AnalyticsResult) -> list[str]:
 # ══════════════════════════════════════════════════════════════════════════
 
 # States and banks for drill-down suggestions
-_STATES = ["Maharashtra", "Karnataka", "Delhi", "Tamil Nadu", "Gujarat",
-           "Rajasthan", "West Bengal", "Telangana", "Andhra Pradesh", "Uttar Pradesh"]
-_BANKS  = ["HDFC", "SBI", "ICICI", "Axis", "Kotak", "PNB", "Yes Bank", "IndusInd"]
+_STATES = ("Maharashtra", "Karnataka", "Delhi", "Tamil Nadu", "Gujarat",
+           "Rajasthan", "West Bengal", "Telangana", "Andhra Pradesh", "Uttar Pradesh")
+_BANKS  = ("HDFC", "SBI", "ICICI", "Axis", "Kotak", "PNB", "Yes Bank", "IndusInd")
+
+# current value → the two alternatives to suggest; values outside the lists
+# fall back to the first two entries
+_STATE_DRILL = {s: tuple(x for x in _STATES if x != s)[:2] for s in _STATES}
+_BANK_DRILL  = {b: tuple(x for x in _BANKS  if x != b)[:2] for b in _BANKS}
+_STATE_DRILL_DEFAULT = _STATES[:2]
+_BANK_DRILL_DEFAULT  = _BANKS[:2]
+
+# Metric to suggest switching to for the same breakdown
+_METRIC_ALTS = {
+    "fraud_rate":   "failure rate",
+    "failure_rate": "fraud rate",
+    "avg_amount":   "transaction count",
+    "count":        "total volume",
+    "total_volume": "average amount",
+}
+
+# Safe generic questions used to top the list up to 4
+_GENERIC_FOLLOW_UPS = (
+    "Show me the overall summary",
+    "Which bank has the highest failure rate?",
+    "Compare fraud rate by device",
+    "Top 5 states by transaction volume",
+)
+
+
+@lru_cache(maxsize=8)
+def _dim_suggestions_for(metric: str) -> dict[str, tuple[str, ...]]:
+    """Cross-dimension suggestions per group-by, formatted once per metric."""
+    metric_h = metric.replace("_", " ")
+    return {
+        "device_type":       (f"Compare {metric_h} by network type",
+                              f"Show {metric_h} trend by hour"),
+        "network_type":      (f"Compare {metric_h} by device",
+                              "Which state has the highest failure rate?"),
+        "sender_state":      (f"Compare {metric_h} by bank",
+                              f"Compare {metric_h} by device"),
+        "sender_bank":       (f"Compare {metric_h} by state",
+                              f"Compare {metric_h} by network type"),
+        "merchant_category": (f"Which state has the highest {metric_h}?",
+                              f"Show {metric_h} trend by day"),
+        "sender_age_group":  (f"Compare {metric_h} by device",
+                              f"Compare {metric_h} by state"),
+        "hour_of_day":       ("Compare failure rate by network type",
+                              "Show fraud rate by day of week"),
+        "day_of_week":       ("Show fraud trend by hour",
+                              "Compare failure rate by bank"),
+    }
 
-def _compute_follow_ups(result: AnalyticsResult) -> list[str]:
+
+def _compute_follow_ups(result: AnalyticsResult, top_idx: Optional[int]) -> list[str]:
     metric  = result.metric
     group   = result.group_by
     filters = result.filters
@@ -114,87 +182,52 @@ def _compute_follow_ups(result: AnalyticsResult) -> list[str]:
     suggestions = []
 
     # ── 1. Drill down into top result ─────────────────────────────────────
-    if df is not None and not df.empty and group and group in df.columns:
-        top_val = str(df.sort_values("value", ascending=False).iloc[0][group])
+    if top_idx is not None and group and group in df.columns:
+        top_val = str(df[group].iat[top_idx])
 
         # Suggest a different state if already filtered by one state
         if group == "sender_state" or "sender_state" in filters:
             current_state = filters.get("sender_state", top_val)
-            others = [s for s in _STATES if s != current_state][:2]
-            for s in others:
-                suggestions.append(f"What about {s}?")
+            others = _STATE_DRILL.get(current_state, _STATE_DRILL_DEFAULT)
+            suggestions.extend(f"What about {s}?" for s in others)
 
         # Suggest a different bank
         elif group == "sender_bank" or "sender_bank" in filters:
             current_bank = filters.get("sender_bank", top_val)
-            others = [b for b in _BANKS if b != current_bank][:2]
-            for b in others:
-                suggestions.append(f"What about {b}?")
+            others = _BANK_DRILL.get(current_bank, _BANK_DRILL_DEFAULT)
+            suggestions.extend(f"What about {b}?" for b in others)
 
         # Suggest filtering by top segment
         elif group in ("device_type", "network_type", "transaction_type"):
             suggestions.append(f"Show only {top_val}")
 
     # ── 2. Cross-dimension drill ──────────────────────────────────────────
-    dim_suggestions = {
-        "device_type":       [f"Compare {metric.replace('_',' ')} by network type",
-                              f"Show {metric.replace('_',' ')} trend by hour"],
-        "network_type":      [f"Compare {metric.replace('_',' ')} by device",
-                              "Which state has the highest failure rate?"],
-        "sender_state":      [f"Compare {metric.replace('_',' ')} by bank",
-                              f"Compare {metric.replace('_',' ')} by device"],
-        "sender_bank":       [f"Compare {metric.replace('_',' ')} by state",
-                              f"Compare {metric.replace('_',' ')} by network type"],
-        "merchant_category": [f"Which state has the highest {metric.replace('_',' ')}?",
-                              f"Show {metric.replace('_',' ')} trend by day"],
-        "sender_age_group":  [f"Compare {metric.replace('_',' ')} by device",
-                              f"Compare {metric.replace('_',' ')} by state"],
-        "hour_of_day":       ["Compare failure rate by network type",
-                              "Show fraud rate by day of week"],
-        "day_of_week":       ["Show fraud trend by hour",
-                              "Compare failure rate by bank"],
-    }
+    dim_suggestions = _dim_suggestions_for(metric)
     if group in dim_suggestions:
-        suggestions += dim_suggestions[group]
+        suggestions.extend(dim_suggestions[group])
 
     # ── 3. Metric switch suggestions ──────────────────────────────────────
-    metric_alts = {
-        "fraud_rate":   "failure rate",
-        "failure_rate": "fraud rate",
-        "avg_amount":   "transaction count",
-        "count":        "total volume",
-        "total_volume": "average amount",
-    }
-    alt = metric_alts.get(metric)
+    alt = _METRIC_ALTS.get(metric)
     if alt and group:
         dim_lbl = DIM_LABELS.get(group, group)
         suggestions.append(f"Show {alt} by {dim_lbl.lower()}")
 
-    # ── 4. Always include at least one safe generic ───────────────────────
-    generics = [
-        "Show me the overall summary",
-        "Which bank has the highest failure rate?",
-        "Compare fraud rate by device",
-        "Top 5 states by transaction volume",
-    ]
-    for g in generics:
-        if len(suggestions) >= 4:
-            break
-        if g not in suggestions:
-            suggestions.append(g)
-
-    return suggestions[:4]
+    # ── 4. Top up with safe generics — stream at most 4 without concatenating ─
+    seen     = set(suggestions)
+    generics = (g for g in _GENERIC_FOLLOW_UPS if g not in seen)
+    return list(islice(chain(suggestions, generics), 4))
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  CONFIDENCE LABEL
 # ══════════════════════════════════════════════════════════════════════════
 
+_CONF_THRESH = (0.55, 0.70, 0.85)
+_CONF_LABELS = ("Low", "Medium", "High", "Very High")
+
+
 def _confidence_label(conf: float) -> str:
-    if conf >= 0.85: return "Very High"
-    if conf >= 0.70: return "High"
-    if conf >= 0.55: return "Medium"
-    return "Low"
+    return _CONF_LABELS[bisect_right(_CONF_THRESH, conf)]
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -220,7 +253,7 @@ def _select_chart_type(result: AnalyticsResult) -> str:
 #  HEADLINE (clean — no raw asterisks)
 # ══════════════════════════════════════════════════════════════════════════
 
-def _build_headline(result: AnalyticsResult) -> str:
+def _build_headline(result: AnalyticsResult, top_idx: Optional[int]) -> str:
     ml  = result.metric_label
     dl  = result.dim_label
     compare = result.compare
@@ -233,9 +266,9 @@ def _build_headline(result: AnalyticsResult) -> str:
     if result.intent == "single" and result.scalar_fmt:
         return f"{ml}: {result.scalar_fmt}"
 
-    if result.intent in ("comparison", "ranking") and result.result_df is not None:
+    if result.intent in ("comparison", "ranking") and top_idx is not None:
         dim  = result.group_by
-        best = result.result_df.sort_values("value", ascending=False).iloc[0]
+        best = result.result_df.iloc[top_idx]
         grp  = str(best[dim]) if dim and dim in best.index else "—"
         val  = _fmt_value(best["value"], result.metric)
         return f"Top {dl} for {ml}: {grp} at {val}"
@@ -254,13 +287,19 @@ def _build_headline(result: AnalyticsResult) -> str:
 # ══════════════════════════════════════════════════════════════════════════
 
 def generate_response(result: AnalyticsResult, confidence: float) -> InsightResponse:
+    # Read the value column once; headline, risk flags and follow-ups all
+    # work from this array and its argmax instead of re-reading result_df.
+    df      = result.result_df
+    vals    = df["value"].to_numpy() if df is not None and not df.empty else None
+    top_idx = int(vals.argmax()) if vals is not None else None
+
     resp = InsightResponse()
-    resp.headline         = _build_headline(result)
+    resp.headline         = _build_headline(result, top_idx)
     resp.narrative        = result.narrative
     resp.bullets          = result.insight_bullets
-    resp.risk_flags       = _compute_risk_flags(result)
+    resp.risk_flags       = _compute_risk_flags(result, vals)
     resp.recommendations  = _compute_recommendations(result)
-    resp.follow_ups       = _compute_follow_ups(result)
+    resp.follow_ups       = _compute_follow_ups(result, top_idx)
     resp.confidence_bar   = confidence
     resp.confidence_label = _confidence_label(confidence)
     resp.chart_type       = _select_chart_type(result)
@@ -11,13 +11,24 @@ v2 — Added:
 """
 
 from __future__ import annotations
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+import gzip
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 from typing import Optional, List
 
 from src.analytics_engine import AnalyticsResult, METRIC_AGG, DIM_LABELS
 
+# optional fast JSON engine for figure export — plotly falls back to stdlib json
+try:
+    import orjson  # noqa: F401
+    _FIG_JSON_ENGINE = "orjson"
+except ImportError:
+    _FIG_JSON_ENGINE = "json"
+
 # ══════════════════════════════════════════════════════════════════════════
 #  THEME
 # ══════════════════════════════════════════════════════════════════════════
@@ -42,6 +53,24 @@ COMPARE_COLORS = [
     "#EF4444", "#F97316", "#06B6D4", "#8B5CF6",
 ]
 
+
+@lru_cache(maxsize=64)
+def _hex_to_rgb(hex_color: str):
+    """Convert #RRGGBB to (R, G, B) tuple."""
+    h = hex_color.lstrip("#")
+    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+
+
+# Parsed once — radar fills index these alongside COMPARE_COLORS
+COMPARE_RGB      = [_hex_to_rgb(c) for c in COMPARE_COLORS]
+COMPARE_FILLS_15 = [f"rgba({r},{g},{b},0.15)" for r, g, b in COMPARE_RGB]
+
+# bar_chart's cyan → amber ramp, pre-baked for 256 steps of the normalised value
+_BAR_GRADIENT = np.array([
+    f"rgba({int(239 * v)}, {int(212 - 212 * v)}, {int(255 - 255 * v)}, 0.85)"
+    for v in np.arange(256) / 255
+])
+
 GRADIENT_SCALE = [
     [0.0,  "#1E293B"],
     [0.4,  "#0EA5E9"],
@@ -55,37 +84,68 @@ RISK_SCALE = [
     [1.0, "#EF4444"],
 ]
 
+# Standard grid-line axis; per-figure xaxis/yaxis dicts spread it and add their own keys
+_AXIS_GRID = MappingProxyType(dict(gridcolor=PALETTE["border"], showgrid=True, zeroline=False))
+
+# Hover strings per (chart kind, metric label), formatted on first use
+_HOVER_FORMATS = {
+    "hbar": "<b>%{{y}}</b><br>{label}: %{{x:.2f}}<extra></extra>",
+    "vbar": "<b>%{{x}}</b><br>{label}: %{{y:.2f}}<extra></extra>",
+}
+_HOVER_TEMPLATES: dict[tuple[str, str], str] = {}
+
+
+def _hover(kind: str, label: str) -> str:
+    key = (kind, label)
+    tmpl = _HOVER_TEMPLATES.get(key)
+    if tmpl is None:
+        tmpl = _HOVER_TEMPLATES[key] = _HOVER_FORMATS[kind].format(label=label)
+    return tmpl
+
+
 _BASE_LAYOUT = dict(
     paper_bgcolor = PALETTE["bg"],
     plot_bgcolor  = PALETTE["surface"],
     font          = dict(family="DM Sans, sans-serif", color=PALETTE["text"], size=13),
     margin        = dict(l=40, r=20, t=50, b=40),
-    xaxis         = dict(gridcolor=PALETTE["border"], showgrid=True, zeroline=False),
-    yaxis         = dict(gridcolor=PALETTE["border"], showgrid=True, zeroline=False),
+    xaxis         = dict(_AXIS_GRID),
+    yaxis         = dict(_AXIS_GRID),
     hoverlabel    = dict(bgcolor=PALETTE["surface"], bordercolor=PALETTE["border"], font_size=13),
     legend        = dict(bgcolor=PALETTE["surface"], bordercolor=PALETTE["border"]),
 )
 
+# Size limits: WebGL line traces above this many points, anomaly bars capped at this many
+_WEBGL_MIN_POINTS = 5000
+_ANOMALY_MAX_BARS = 50
+
 # Base layout WITHOUT xaxis/yaxis/legend — safe to use when you override them yourself
 _BASE_LAYOUT_NO_AXES = {k: v for k, v in _BASE_LAYOUT.items() if k not in ("xaxis", "yaxis", "legend")}
 
+# Both base layouts are built once and handed to update_layout() positionally —
+# never spread (**) or copied per figure, and never mutated.  They stay in
+# fig.layout rather than a Plotly template because Streamlit's theme overwrites
+# layout.template.layout at render time.
+
 
 def _apply_base(fig: go.Figure, title: str = "") -> go.Figure:
-    layout = dict(**_BASE_LAYOUT)
     if title:
-        layout["title"] = dict(text=title, font=dict(size=16, color=PALETTE["text"]), x=0)
-    fig.update_layout(**layout)
+        fig.update_layout(_BASE_LAYOUT, title=dict(text=title, font=dict(size=16, color=PALETTE["text"]), x=0))
+    else:
+        fig.update_layout(_BASE_LAYOUT)
     return fig
 
 
+_METRIC_COLOR = {
+    "fraud_rate":   PALETTE["danger"],
+    "failure_rate": PALETTE["warning"],
+    "avg_amount":   PALETTE["primary"],
+    "count":        PALETTE["secondary"],
+    "total_volume": PALETTE["success"],
+}
+
+
 def _metric_color(metric: str) -> str:
-    return {
-        "fraud_rate":   PALETTE["danger"],
-        "failure_rate": PALETTE["warning"],
-        "avg_amount":   PALETTE["primary"],
-        "count":        PALETTE["secondary"],
-        "total_volume": PALETTE["success"],
-    }.get(metric, PALETTE["primary"])
+    return _METRIC_COLOR.get(metric, PALETTE["primary"])
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -100,37 +160,38 @@ def bar_chart(result: AnalyticsResult) -> go.Figure:
     if df is None or df.empty:
         return go.Figure()
 
-    x_col     = dim if dim in df.columns else df.columns[0]
-    df_sorted = df.sort_values("value", ascending=True)
+    # Work on NumPy arrays, sorted ascending so the largest bar is on top
+    x_col  = dim if dim in df.columns else df.columns[0]
+    vals   = df["value"].to_numpy()
+    order  = np.argsort(vals)
+    vals   = vals[order]
+    labels = df[x_col].to_numpy().astype(str)[order]
 
-    norm_vals = (df_sorted["value"] - df_sorted["value"].min()) / (
-        (df_sorted["value"].max() - df_sorted["value"].min()) or 1
-    )
-    colors = [
-        f"rgba({int(0 + 239*v)}, {int(212 - 212*v)}, {int(255 - 255*v)}, 0.85)"
-        for v in norm_vals
-    ]
+    # already sorted, so the range comes from the ends — no min/max scans
+    vmin      = vals[0]
+    norm_vals = (vals - vmin) / ((vals[-1] - vmin) or 1)
+    colors     = _BAR_GRADIENT[(norm_vals * 255).astype(np.uint8)].tolist()
+
+    fmt = METRIC_AGG[result.metric]["fmt"].format
 
     fig = go.Figure(go.Bar(
-        x            = df_sorted["value"],
-        y            = df_sorted[x_col].astype(str),
+        x            = vals,
+        y            = labels,
         orientation  = "h",
         marker_color = colors,
-        text         = df_sorted["value"].apply(
-            lambda v: METRIC_AGG[result.metric]["fmt"].format(v)
-        ),
+        text         = [fmt(v) for v in vals.tolist()],
         textposition = "outside",
         textfont     = dict(color=PALETTE["text"], size=11),
-        hovertemplate= f"<b>%{{y}}</b><br>{result.metric_label}: %{{x:.2f}}<extra></extra>",
+        hovertemplate= _hover("hbar", result.metric_label),
     ))
 
     # ✅ FIX: use _BASE_LAYOUT_NO_AXES so xaxis/yaxis are never duplicated
     fig.update_layout(
-        **_BASE_LAYOUT_NO_AXES,
+        _BASE_LAYOUT_NO_AXES,
         title  = dict(text=f"{result.metric_label} by {result.dim_label}", font=dict(size=15, color=PALETTE["text"])),
-        xaxis  = dict(title=result.metric_label, gridcolor=PALETTE["border"], showgrid=True, zeroline=False),
+        xaxis  = dict(_AXIS_GRID, title=result.metric_label),
         yaxis  = dict(title="", gridcolor="rgba(0,0,0,0)", showgrid=True, zeroline=False, tickfont=dict(size=11)),
-        height = max(320, len(df_sorted) * 40 + 80),
+        height = max(320, len(vals) * 40 + 80),
     )
     return fig
 
@@ -145,27 +206,35 @@ def line_chart(result: AnalyticsResult) -> go.Figure:
 
     x_col = dim if dim in df.columns else df.columns[0]
 
+    # SVG bogs down past a few thousand points — switch to WebGL (no spline support)
+    webgl   = len(df) > _WEBGL_MIN_POINTS
+    scatter = go.Scattergl if webgl else go.Scatter
+
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
-        x            = df[x_col].astype(str),
-        y            = df["value"],
+    # string labels and values pulled once; the anomaly overlay slices them
+    x_str = df[x_col].to_numpy().astype(str)
+    vals  = df["value"].to_numpy()
+
+    fig.add_trace(scatter(
+        x            = x_str,
+        y            = vals,
         mode         = "lines+markers",
-        line         = dict(color=PALETTE["primary"], width=2.5, shape="spline"),
+        line         = dict(color=PALETTE["primary"], width=2.5, shape="linear" if webgl else "spline"),
         marker       = dict(size=7, color=PALETTE["primary"], line=dict(color=PALETTE["bg"], width=1.5)),
         fill         = "tozeroy",
         fillcolor    = "rgba(0,212,255,0.12)",
         name         = result.metric_label,
-        hovertemplate= f"<b>%{{x}}</b><br>{result.metric_label}: %{{y:.2f}}<extra></extra>",
+        hovertemplate= _hover("vbar", result.metric_label),
     ))
 
     if result.anomalies:
-        anom_groups = {a["group"] for a in result.anomalies}
-        anom_df = df[df[x_col].astype(str).isin(anom_groups)]
-        if not anom_df.empty:
-            fig.add_trace(go.Scatter(
-                x          = anom_df[x_col].astype(str),
-                y          = anom_df["value"],
+        anom_groups = frozenset(a["group"] for a in result.anomalies)
+        mask = np.isin(x_str, list(anom_groups))
+        if mask.any():
+            fig.add_trace(scatter(
+                x          = x_str[mask],
+                y          = vals[mask],
                 mode       = "markers",
                 marker     = dict(size=13, color=PALETTE["danger"], symbol="diamond",
                                   line=dict(color="#fff", width=1.5)),
@@ -175,11 +244,11 @@ def line_chart(result: AnalyticsResult) -> go.Figure:
 
     # ✅ FIX: use _BASE_LAYOUT_NO_AXES
     fig.update_layout(
-        **_BASE_LAYOUT_NO_AXES,
+        _BASE_LAYOUT_NO_AXES,
         title  = dict(text=f"{result.metric_label} Trend over {DIM_LABELS.get(dim, dim)}",
                       font=dict(size=15, color=PALETTE["text"])),
-        xaxis  = dict(title=DIM_LABELS.get(dim, dim), gridcolor=PALETTE["border"], showgrid=True, zeroline=False, tickangle=-30),
-        yaxis  = dict(title=result.metric_label, gridcolor=PALETTE["border"], showgrid=True, zeroline=False),
+        xaxis  = dict(_AXIS_GRID, title=DIM_LABELS.get(dim, dim), tickangle=-30),
+        yaxis  = dict(_AXIS_GRID, title=result.metric_label),
         height = 380,
     )
     return fig
@@ -208,53 +277,56 @@ def comparison_bar_chart(
 
     x_col = dim if dim in df.columns else df.columns[0]
 
+    # String labels cast once; filtering and sorting reorder them alongside the values
+    x_str = df[x_col].to_numpy().astype(str)
+    vals  = df["value"].to_numpy()
+
     # Filter to only the requested comparison groups if specified
     if compare_values:
-        mask = df[x_col].astype(str).isin([str(v) for v in compare_values])
-        df   = df[mask]
+        mask  = np.isin(x_str, [str(v) for v in compare_values])
+        x_str = x_str[mask]
+        vals  = vals[mask]
 
-    df = df.sort_values("value", ascending=False)
+    order  = np.argsort(-vals, kind="stable")
+    labels = x_str[order]
+    vals   = vals[order]
 
     fig = go.Figure()
 
-    for i, (_, row) in enumerate(df.iterrows()):
-        color = COMPARE_COLORS[i % len(COMPARE_COLORS)]
-        val   = row["value"]
-        label = str(row[x_col])
-        fmt   = METRIC_AGG[result.metric]["fmt"].format(val)
+    # One trace for all segments — colours, labels and hover text are per-bar arrays
+    if len(vals):
+        colors = [COMPARE_COLORS[i % len(COMPARE_COLORS)] for i in range(len(vals))]
+        fmt    = METRIC_AGG[result.metric]["fmt"].format
+        texts  = [fmt(v) for v in vals.tolist()]
 
         fig.add_trace(go.Bar(
-            name         = label,
-            x            = [label],
-            y            = [val],
-            marker_color = color,
+            name         = result.metric_label,
+            x            = labels,
+            y            = vals,
+            marker_color = colors,
             marker_line  = dict(color=PALETTE["bg"], width=2),
-            text         = [fmt],
+            text         = texts,
             textposition = "outside",
-            textfont     = dict(color=color, size=13, family="DM Sans"),
-            hovertemplate= f"<b>{label}</b><br>{result.metric_label}: {fmt}<extra></extra>",
+            textfont     = dict(color=colors, size=13, family="DM Sans"),
+            hovertext    = [f"<b>{l}</b><br>{result.metric_label}: {t}" for l, t in zip(labels, texts)],
+            hovertemplate= "%{hovertext}<extra></extra>",
         ))
 
     # Rank badge annotation — highlight winner
-    if not df.empty:
-        winner_row = df.iloc[0]
-        winner_val = winner_row["value"]
-        winner_lbl = str(winner_row[x_col])
+    if len(vals):
+        winner_val = vals[0]
+        winner_lbl = labels[0]
         winner_fmt = METRIC_AGG[result.metric]["fmt"].format(winner_val)
 
-    title_text = f"{result.metric_label}: {' vs '.join(df[x_col].astype(str).tolist())}"
+    title_text = f"{result.metric_label}: {' vs '.join(labels.tolist())}"
 
     fig.update_layout(
-        **_BASE_LAYOUT_NO_AXES,
+        _BASE_LAYOUT_NO_AXES,
         title       = dict(text=title_text, font=dict(size=15, color=PALETTE["text"])),
         xaxis       = dict(title="", gridcolor=PALETTE["border"], showgrid=False, zeroline=False),
-        yaxis       = dict(title=result.metric_label, gridcolor=PALETTE["border"], showgrid=True, zeroline=False),
+        yaxis       = dict(_AXIS_GRID, title=result.metric_label),
         barmode     = "group",
-        showlegend  = True,
-        legend      = dict(
-            bgcolor=PALETTE["surface"], bordercolor=PALETTE["border"],
-            orientation="h", y=-0.15, x=0.5, xanchor="center",
-        ),
+        showlegend  = False,  # single trace; the x-axis already names each segment
         height      = 420,
         bargap      = 0.25,
         bargroupgap = 0.1,
@@ -285,35 +357,27 @@ def comparison_radar_chart(
 
     fig = go.Figure()
 
-    for i, (segment, values) in enumerate(all_metrics_data.items()):
-        color = COMPARE_COLORS[i % len(COMPARE_COLORS)]
-
-        # Normalize values to 0–1 for radar (min-max across segments per metric)
-        raw = [values.get(m, 0) for m in metrics]
+    # Normalize values to 0–1 for radar (min-max across segments per metric),
+    # once for the whole segments × metrics matrix
+    mat = np.array([[v.get(m, 0) for m in metrics] for v in all_metrics_data.values()], dtype=float)
+    normed_mat = (mat - mat.min(axis=0)) / (np.ptp(mat, axis=0) + 1e-9)
 
-        # Simple normalization per metric across all segments
-        all_vals_per_metric = {
-            m: [v.get(m, 0) for v in all_metrics_data.values()]
-            for m in metrics
-        }
-        normed = []
-        for m, rv in zip(metrics, raw):
-            mn = min(all_vals_per_metric[m])
-            mx = max(all_vals_per_metric[m])
-            normed.append((rv - mn) / (mx - mn + 1e-9))
+    for i, (segment, row) in enumerate(zip(all_metrics_data, normed_mat)):
+        color  = COMPARE_COLORS[i % len(COMPARE_COLORS)]
+        normed = row.tolist()
 
         fig.add_trace(go.Scatterpolar(
             r     = normed + [normed[0]],  # close the polygon
             theta = metric_labels + [metric_labels[0]],
             fill  = "toself",
-            fillcolor = f"rgba{tuple(list(_hex_to_rgb(color)) + [0.15])}",
+            fillcolor = COMPARE_FILLS_15[i % len(COMPARE_FILLS_15)],
             line  = dict(color=color, width=2),
             name  = segment,
             hovertemplate="<b>" + segment + "</b><br>%{theta}: %{r:.2f}<extra></extra>",
         ))
 
     fig.update_layout(
-        **_BASE_LAYOUT_NO_AXES,
+        _BASE_LAYOUT_NO_AXES,
         polar = dict(
             bgcolor    = PALETTE["surface"],
             radialaxis = dict(
@@ -357,25 +421,31 @@ def comparison_delta_chart(
         return go.Figure()
 
     x_col = dim if dim in df.columns else df.columns[0]
+    labels = df[x_col].to_numpy().astype(str)
+    vals   = df["value"].to_numpy()
 
     if compare_values:
-        df = df[df[x_col].astype(str).isin([str(v) for v in compare_values])]
+        mask   = np.isin(labels, [str(v) for v in compare_values])
+        labels = labels[mask]
+        vals   = vals[mask]
 
-    df       = df.copy()
-    avg      = df["value"].mean()
-    df["delta"]   = df["value"] - avg
-    df["is_above"] = df["delta"] >= 0
-    df = df.sort_values("delta", ascending=True)
+    # Deltas live only in these arrays — no DataFrame copy or helper columns
+    # NaN-skipping like Series.mean(); the guard also covers empty / all-NaN
+    avg    = float("nan") if np.isnan(vals).all() else np.nanmean(vals)
+    delta  = vals - avg
+    order  = np.argsort(delta)
+    delta  = delta[order]
+    labels = labels[order]
 
-    colors = [PALETTE["danger"] if above else PALETTE["success"] for above in df["is_above"]]
+    colors = np.where(delta >= 0, PALETTE["danger"], PALETTE["success"]).tolist()
 
     fig = go.Figure(go.Bar(
-        x            = df["delta"],
-        y            = df[x_col].astype(str),
+        x            = delta,
+        y            = labels,
         orientation  = "h",
         marker_color = colors,
         marker_line  = dict(color=PALETTE["bg"], width=1),
-        text         = df["delta"].apply(lambda v: f"+{v:.2f}" if v >= 0 else f"{v:.2f}"),
+        text         = [f"+{v:.2f}" if v >= 0 else f"{v:.2f}" for v in delta.tolist()],
         textposition = "outside",
         textfont     = dict(color=PALETTE["text"], size=11),
         hovertemplate= f"<b>%{{y}}</b><br>Δ from avg: %{{x:+.2f}}<extra></extra>",
@@ -393,14 +463,14 @@ def comparison_delta_chart(
     )
 
     fig.update_layout(
-        **_BASE_LAYOUT_NO_AXES,
+        _BASE_LAYOUT_NO_AXES,
         title  = dict(
             text = f"{result.metric_label} — Delta from Average",
             font = dict(size=15, color=PALETTE["text"]),
         ),
         xaxis  = dict(title=f"Δ {result.metric_label}", gridcolor=PALETTE["border"], showgrid=True, zeroline=True, zerolinecolor=PALETTE["border"]),
         yaxis  = dict(title="", gridcolor="rgba(0,0,0,0)", showgrid=False, zeroline=False, tickfont=dict(size=11)),
-        height = max(320, len(df) * 44 + 80),
+        height = max(320, len(delta) * 44 + 80),
     )
     return fig
 
@@ -454,14 +524,16 @@ def heatmap_hourly(df_hour: pd.DataFrame, metric: str) -> go.Figure:
     days  = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
     hours = list(range(24))
 
-    z = [[0.0] * 24 for _ in range(7)]
-    for _, row in df_hour.iterrows():
-        try:
-            d_idx = days.index(str(row.get("day_of_week", "")))
-            h_idx = int(row.get("hour_of_day", 0))
-            z[d_idx][h_idx] = float(row.get("value", 0))
-        except (ValueError, TypeError):
-            pass
+    # day × hour grid in one pivot; cells with no (valid) data stay 0
+    if {"day_of_week", "hour_of_day", "value"}.issubset(df_hour.columns):
+        piv = (df_hour.assign(day_of_week = df_hour["day_of_week"].astype(str),
+                              hour_of_day = pd.to_numeric(df_hour["hour_of_day"], errors="coerce"),
+                              value       = pd.to_numeric(df_hour["value"], errors="coerce"))
+                      .pivot_table(index="day_of_week", columns="hour_of_day",
+                                   values="value", aggfunc="mean"))
+        z = piv.reindex(index=days, columns=hours).to_numpy(dtype=float, na_value=0.0)
+    else:
+        z = np.zeros((7, 24))
 
     scale = RISK_SCALE if metric in ("fraud_rate", "failure_rate") else GRADIENT_SCALE
 
@@ -474,7 +546,7 @@ def heatmap_hourly(df_hour: pd.DataFrame, metric: str) -> go.Figure:
         hovertemplate="<b>%{y}</b> %{x}<br>Value: %{z:.2f}<extra></extra>",
     ))
     fig.update_layout(
-        **_BASE_LAYOUT,
+        _BASE_LAYOUT,
         title  = dict(text=f"{METRIC_AGG.get(metric,{}).get('label','Metric')} — Hourly Heatmap",
                       font=dict(size=15, color=PALETTE["text"])),
         height = 350,
@@ -486,52 +558,85 @@ def anomaly_chart(result: AnalyticsResult) -> go.Figure:
     """Bar chart highlighting anomalous groups."""
     df          = result.result_df
     dim         = result.group_by or "group_by"
-    anom_groups = {a["group"] for a in result.anomalies}
+    anom_groups = frozenset(a["group"] for a in result.anomalies)
 
     if df is None or df.empty:
         return go.Figure()
 
     x_col = dim if dim in df.columns else df.columns[0]
 
-    colors = [
-        PALETTE["danger"] if str(row[x_col]) in anom_groups else PALETTE["surface"]
-        for _, row in df.iterrows()
-    ]
+    # labels and values pulled once, shared by the colour mask, the cap and the trace
+    labels  = df[x_col].to_numpy().astype(str)
+    vals    = df["value"].to_numpy()
+    is_anom = np.isin(labels, list(anom_groups))
+
+    # Too many bars to read (or render) — keep every anomaly plus the largest
+    # of the rest, in their original order, and note how many were dropped
+    hidden = 0
+    if len(df) > _ANOMALY_MAX_BARS:
+        rest   = np.flatnonzero(~is_anom)
+        n_keep = max(_ANOMALY_MAX_BARS - int(is_anom.sum()), 0)
+        keep   = is_anom.copy()
+        keep[rest[np.argsort(-vals[rest], kind="stable")[:n_keep]]] = True
+        hidden  = len(df) - int(keep.sum())
+        labels  = labels[keep]
+        vals    = vals[keep]
+        is_anom = is_anom[keep]
+
+    colors = np.where(is_anom, PALETTE["danger"], PALETTE["surface"])
+    fmt    = METRIC_AGG[result.metric]["fmt"].format
 
     fig = go.Figure(go.Bar(
-        x            = df[x_col].astype(str),
-        y            = df["value"],
+        x            = labels,
+        y            = vals,
         marker_color = colors,
         marker_line  = dict(color=PALETTE["border"], width=1),
-        text         = df["value"].apply(lambda v: METRIC_AGG[result.metric]["fmt"].format(v)),
+        text         = [fmt(v) for v in vals.tolist()],
         textposition = "outside",
-        hovertemplate= f"<b>%{{x}}</b><br>{result.metric_label}: %{{y:.2f}}<extra></extra>",
+        hovertemplate= _hover("vbar", result.metric_label),
     ))
 
     fig.update_layout(
-        **_BASE_LAYOUT,
+        _BASE_LAYOUT,
         title  = dict(text=f"Anomaly Detection — {result.metric_label} by {result.dim_label}",
                       font=dict(size=15, color=PALETTE["text"])),
         height = 380,
     )
+    if hidden:
+        fig.add_annotation(
+            text=f"…and {hidden} more", xref="paper", yref="paper", x=1, y=1.06,
+            showarrow=False, font=dict(color=PALETTE["muted"], size=11),
+        )
     return fig
 
 
+_DONUT_COLORS = [
+    "#00D4FF","#7C3AED","#F59E0B","#10B981","#EF4444",
+    "#F97316","#06B6D4","#8B5CF6","#EC4899","#14B8A6",
+]
+_DONUT_TOP_K = 10
+
+
 def donut_chart(df: pd.DataFrame, dim: str, metric: str = "count") -> go.Figure:
     """Donut for share/composition view."""
     if df is None or df.empty:
         return go.Figure()
 
     x_col  = dim if dim in df.columns else df.columns[0]
-    colors = [
-        "#00D4FF","#7C3AED","#F59E0B","#10B981","#EF4444",
-        "#F97316","#06B6D4","#8B5CF6","#EC4899","#14B8A6",
-    ]
+    colors = _DONUT_COLORS[:len(df)]
+
+    # Keep the slice count bounded — everything past the top K becomes "Other"
+    if len(df) > _DONUT_TOP_K:
+        ranked = df[[x_col, "value"]].sort_values("value", ascending=False)
+        other  = pd.DataFrame({x_col: ["Other"], "value": [ranked["value"].iloc[_DONUT_TOP_K:].sum()]})
+        df     = pd.concat([ranked.head(_DONUT_TOP_K), other], ignore_index=True)
+        colors = _DONUT_COLORS[:_DONUT_TOP_K] + [PALETTE["muted"]]
+
     fig = go.Figure(go.Pie(
-        labels        = df[x_col].astype(str),
-        values        = df["value"],
+        labels        = df[x_col].to_numpy().astype(str),
+        values        = df["value"].to_numpy(),
         hole          = 0.55,
-        marker_colors = colors[:len(df)],
+        marker_colors = colors,
         textinfo      = "label+percent",
         textfont      = dict(size=11, color=PALETTE["text"]),
         hovertemplate = "<b>%{label}</b><br>Value: %{value:,.0f}<br>Share: %{percent}<extra></extra>",
@@ -550,14 +655,14 @@ def overview_kpi_bars(df: pd.DataFrame) -> go.Figure:
     """Compact multi-metric bar for the dashboard overview."""
     categories = df["merchant_category"].value_counts().head(8)
     fig = go.Figure(go.Bar(
-        x            = categories.values,
-        y            = categories.index,
+        x            = categories.to_numpy(),
+        y            = categories.index.to_numpy(),
         orientation  = "h",
         marker_color = PALETTE["primary"],
         hovertemplate= "<b>%{y}</b><br>Transactions: %{x:,}<extra></extra>",
     ))
     fig.update_layout(
-        **_BASE_LAYOUT,
+        _BASE_LAYOUT,
         title  = dict(text="Top Categories by Transaction Volume", font=dict(size=14, color=PALETTE["text"])),
         height = 300,
     )
@@ -568,17 +673,54 @@ def overview_kpi_bars(df: pd.DataFrame) -> go.Figure:
 #  HELPERS
 # ══════════════════════════════════════════════════════════════════════════
 
-def _hex_to_rgb(hex_color: str):
-    """Convert #RRGGBB to (R, G, B) tuple."""
-    h = hex_color.lstrip("#")
-    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+# Figures are fully themed at build time, so a result with the same content
+# always yields the same figure — keep the most recent ones around for reruns.
+_FIG_CACHE: "OrderedDict[tuple, go.Figure]" = OrderedDict()
+_FIG_CACHE_SIZE = 64
+
+
+def _result_fingerprint(result: AnalyticsResult, compare_values: Optional[List[str]]) -> tuple:
+    """Content key for an AnalyticsResult — everything the chart builders read."""
+    df = result.result_df
+    df_key = None
+    if df is not None:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        df_key = (tuple(df.columns), hash(row_hashes.tobytes()))
+    return (
+        result.intent, result.metric, result.metric_label,
+        result.group_by, result.dim_label, result.scalar_value,
+        tuple(compare_values or ()),
+        tuple(a["group"] for a in result.anomalies),
+        df_key,
+    )
 
 
 def pick_chart(result: AnalyticsResult, compare_values: Optional[List[str]] = None) -> go.Figure:
     """
     Smart chart picker — call this from app.py instead of hardcoding chart types.
     Routes to the best visualization based on intent + compare context.
+    Identical results are served from a cache (pick_chart.cache_clear() to
+    empty it). Every call returns its own Figure, so callers may freely
+    update_layout() etc. without touching later results.
     """
+    key = _result_fingerprint(result, compare_values)
+    fig = _FIG_CACHE.get(key)
+    if fig is not None:
+        _FIG_CACHE.move_to_end(key)
+        return go.Figure(fig)
+
+    fig = _pick_chart(result, compare_values)
+    # keep a private copy — copying is a few ms vs. hundreds to rebuild
+    _FIG_CACHE[key] = go.Figure(fig)
+    if len(_FIG_CACHE) > _FIG_CACHE_SIZE:
+        _FIG_CACHE.popitem(last=False)
+    return fig
+
+
+pick_chart.cache_clear = _FIG_CACHE.clear
+
+
+def _pick_chart(result: AnalyticsResult, compare_values: Optional[List[str]]) -> go.Figure:
     intent = result.intent
 
     if intent == "comparison":
@@ -602,3 +744,17 @@ def pick_chart(result: AnalyticsResult, compare_values: Optional[List[str]] = No
 
     # fallback
     return bar_chart(result)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+#  SERIALISATION
+# ══════════════════════════════════════════════════════════════════════════
+
+def fig_to_json(fig: go.Figure) -> str:
+    """Compact (non-pretty) figure JSON, written with orjson when installed."""
+    return fig.to_json(pretty=False, engine=_FIG_JSON_ENGINE)
+
+
+def fig_to_gzip_json(fig: go.Figure) -> bytes:
+    """gzip-compressed figure JSON for transports that don't compress on their own."""
+    return gzip.compress(fig_to_json(fig).encode(), compresslevel=1)
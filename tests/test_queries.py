@@ -1,23 +1,23 @@
 """
 insightx/tests/test_queries.py
 ────────────────────────────────
-Runs all 15 sample queries through the full pipeline
+Runs all sample queries through the full pipeline
 (NLP → Analytics → Response) and prints a formatted report.
 
 Run with:
     python tests/test_queries.py
 """
 
+import os
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import numpy as np
 import pandas as pd
-from pathlib import Path
 
 # Standalone data loader (no streamlit) for test runner
-def load_data():
-    path = Path(__file__).parent.parent / "data" / "upi_transactions_2024.csv"
+def _load_from_csv(path: Path) -> pd.DataFrame:
     df = pd.read_csv(path, low_memory=False)
     df.columns = [c.strip().lower() for c in df.columns]
     df.rename(columns={"transaction id":"transaction_id","transaction type":"transaction_type","amount (inr)":"amount_inr"}, inplace=True)
@@ -28,16 +28,45 @@ def load_data():
     df["hour_of_day"] = pd.to_numeric(df["hour_of_day"], errors="coerce").astype("Int16")
     df["fraud_flag"]  = pd.to_numeric(df["fraud_flag"],  errors="coerce").astype("Int8")
     df["is_weekend"]  = pd.to_numeric(df["is_weekend"],  errors="coerce").astype("Int8")
-    df["is_failed"] = (df["transaction_status"] == "FAILED").astype("Int8")
+    # Plain ndarray comparison — skips the nullable Int8 round-trip
+    df["is_failed"] = (df["transaction_status"].to_numpy() == "FAILED").view(np.int8)
     df["is_fraud"]  = df["fraud_flag"]
     return df
 
+
+def load_data():
+    """Parse the CSV once and reuse a Parquet copy until the CSV changes.
+
+    The copy is also rebuilt when this file (and so _load_from_csv) changes,
+    and whenever it cannot be read; without a usable Parquet engine (pyarrow)
+    the CSV is parsed every run."""
+    csv = Path(__file__).parent.parent / "data" / "upi_transactions_2024.csv"
+    pq  = csv.with_suffix(".parquet")
+    try:
+        newest_src = max(csv.stat().st_mtime, Path(__file__).stat().st_mtime)
+        if pq.exists() and pq.stat().st_mtime >= newest_src:
+            return pd.read_parquet(pq, engine="pyarrow", use_threads=True)
+    except (ImportError, OSError, ValueError):
+        # missing engine, or a truncated / corrupt cache (ArrowInvalid is a ValueError)
+        pass
+
+    df = _load_from_csv(csv)
+    # Write beside the target and swap it in, so an interrupted run never
+    # leaves a half-written cache behind
+    tmp = pq.with_name(f"{pq.stem}.{os.getpid()}.tmp.parquet")
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+        os.replace(tmp, pq)
+    except (ImportError, OSError, ValueError):
+        tmp.unlink(missing_ok=True)
+    return df
+
 from src.nlp_engine         import parse_query
 from src.analytics_engine   import execute_query
 from src.response_generator import generate_response
 
 # ══════════════════════════════════════════════════════════════════════════
-#  SAMPLE QUERY SET (15 diverse queries)
+#  SAMPLE QUERY SET (19 diverse queries)
 # ══════════════════════════════════════════════════════════════════════════
 
 SAMPLE_QUERIES = [
@@ -85,6 +114,12 @@ SAMPLE_QUERIES = [
 
     # 15 — Multi-entity filter
     "What is the fraud rate for HDFC bank users on iOS?",
+
+    # 16-19 — Ascending ranking via hyphenated words
+    "bottom-3 banks",
+    "lowest-fraud states",
+    "least-used banks",
+    "worst-performing states by failure",
 ]
 
 
@@ -95,7 +130,7 @@ SAMPLE_QUERIES = [
 def run_tests(df):
     results = []
     print("\n" + "="*80)
-    print("  InsightX — Sample Query Test Suite (15 Queries)")
+    print(f"  InsightX — Sample Query Test Suite ({len(SAMPLE_QUERIES)} Queries)")
     print("="*80)
 
     for i, query in enumerate(SAMPLE_QUERIES, 1):
@@ -108,6 +143,7 @@ def run_tests(df):
         print(f"  Metric  : {parsed.metric}")
         print(f"  Group By: {parsed.group_by}")
         print(f"  Filters : {parsed.filters}")
+        print(f"  Sort    : {'ascending' if parsed.sort_ascending else 'descending'}")
         print(f"  Conf    : {parsed.confidence:.0%} — {parsed.confidence_reasoning[:80]}…")
 
         # Step 2: Execute
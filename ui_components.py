@@ -8,300 +8,265 @@ Includes:
   - render_chat_message()      — polished AI message cards
   - render_comparison_header() — "X vs Y vs Z" pill header
   - render_context_trail()     — sidebar breadcrumb of conversation
-  - render_metric_pills()      — quick metric selector chips
-  - render_confidence_bar()    — animated confidence indicator
   - render_kpi_row()           — top KPI summary strip
+  - render_result_block()      — KPI row + comparison + message in one call
+  - render_winner_badge()      — "highest X: Y at Z" badge
+  - render_empty_state()       — centered placeholder for a fresh chat
+  - render_divider()           — faded horizontal rule
+  - render_section_label()     — small uppercase section heading
   - inject_custom_css()        — global style overrides
+  - KPI / TrailItem            — typed records accepted alongside plain dicts
 """
 
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+import re
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Union
+
+# Optional Rust-backed template engine — renders far faster; Jinja2 fallback
+try:
+    import minijinja
+    _HAS_MINIJINJA = True
+except ImportError:
+    import jinja2
+    _HAS_MINIJINJA = False
+
+# Optional CSS minifier — regex fallback below
+try:
+    import rcssmin
+    _HAS_RCSSMIN = True
+except ImportError:
+    _HAS_RCSSMIN = False
+
+
+# ══════════════════════════════════════════════════════════════════════════
+#  EMIT
+# ══════════════════════════════════════════════════════════════════════════
+
+# st.html (Streamlit ≥ 1.33) injects HTML directly, skipping the Markdown
+# parse st.markdown does even for pure HTML
+_st_html = getattr(st, "html", None)
+
+
+def _emit(html: str):
+    if _st_html is not None:
+        _st_html(html)
+    else:
+        st.markdown(html, unsafe_allow_html=True)
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  GLOBAL CSS
 # ══════════════════════════════════════════════════════════════════════════
 
+# Stylesheet lives in static/insightx.css and is read once at import. It is
+# still inlined rather than <link>ed: Streamlit's static
+# handler serves anything but images as text/plain with nosniff, which
+# browsers refuse to apply as a stylesheet.
+_CSS_PATH = Path(__file__).parent / "static" / "insightx.css"
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE   = re.compile(r"\s+")
+_CSS_PUNCT   = re.compile(r"\s*([{};,])\s*")
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace; rcssmin when installed."""
+    if _HAS_RCSSMIN:
+        return rcssmin.cssmin(css)
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    css = _CSS_PUNCT.sub(r"\1", css).replace(": ", ":")
+    return css.replace(";}", "}").strip()
+
+
+# Minified once at import — ~25% fewer bytes over the WebSocket per rerun
+_CSS_HTML = f"<style>{_minify_css(_CSS_PATH.read_text(encoding='utf-8'))}</style>"
+
+
 def inject_custom_css():
     """Inject all custom CSS. Call once at the top of app.py."""
-    st.markdown("""
-    <style>
-    /* ── Fonts ── */
-    @import url('https://fonts.googleapis.com/css2?family=DM+Sans:wght@300;400;500;600;700&family=DM+Mono:wght@400;500&display=swap');
-
-    html, body, [class*="css"] {
-        font-family: 'DM Sans', sans-serif;
-    }
-
-    /* ── App background ── */
-    .stApp {
-        background: #0F172A;
-        color: #E2E8F0;
-    }
-
-    /* ── Hide Streamlit chrome ── */
-    #MainMenu, footer, header { visibility: hidden; }
-    .block-container { padding-top: 1rem !important; max-width: 900px; }
-
-    /* ── Scrollbar ── */
-    ::-webkit-scrollbar { width: 6px; }
-    ::-webkit-scrollbar-track { background: #0F172A; }
-    ::-webkit-scrollbar-thumb { background: #334155; border-radius: 3px; }
-
-    /* ── Chat input ── */
-    .stChatInput > div {
-        background: #1E293B !important;
-        border: 1px solid #334155 !important;
-        border-radius: 14px !important;
-    }
-    .stChatInput input {
-        color: #E2E8F0 !important;
-        font-family: 'DM Sans', sans-serif !important;
-    }
-
-    /* ── AI message card ── */
-    .ix-message {
-        background: #1E293B;
-        border: 1px solid #334155;
-        border-radius: 16px;
-        padding: 1.2rem 1.4rem;
-        margin-bottom: 1rem;
-        position: relative;
-        animation: fadeSlideIn 0.3s ease;
-    }
-    @keyframes fadeSlideIn {
-        from { opacity: 0; transform: translateY(8px); }
-        to   { opacity: 1; transform: translateY(0); }
-    }
-    .ix-message-header {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        margin-bottom: 0.7rem;
-    }
-    .ix-bot-avatar {
-        width: 28px; height: 28px;
-        background: linear-gradient(135deg, #00D4FF, #7C3AED);
-        border-radius: 8px;
-        display: flex; align-items: center; justify-content: center;
-        font-size: 14px; font-weight: 700; color: white;
-    }
-    .ix-bot-name {
-        font-size: 12px; font-weight: 600;
-        color: #00D4FF; letter-spacing: 0.05em; text-transform: uppercase;
-    }
-    .ix-message-body {
-        font-size: 14px; line-height: 1.65;
-        color: #CBD5E1;
-    }
-    .ix-message-body strong { color: #E2E8F0; font-weight: 600; }
-
-    /* ── Comparison header ── */
-    .ix-compare-header {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        flex-wrap: wrap;
-        margin-bottom: 1.2rem;
-        padding: 0.8rem 1rem;
-        background: #0F172A;
-        border-radius: 12px;
-        border: 1px solid #334155;
-    }
-    .ix-compare-label {
-        font-size: 11px; font-weight: 600;
-        color: #64748B; text-transform: uppercase; letter-spacing: 0.08em;
-        margin-right: 4px;
-    }
-    .ix-compare-pill {
-        padding: 4px 12px;
-        border-radius: 20px;
-        font-size: 12px; font-weight: 600;
-        border: 1.5px solid;
-        white-space: nowrap;
-    }
-    .ix-vs-divider {
-        color: #475569; font-size: 11px; font-weight: 700;
-    }
-
-    /* ── Context trail (sidebar) ── */
-    .ix-trail-item {
-        padding: 8px 10px;
-        margin-bottom: 6px;
-        background: #0F172A;
-        border-radius: 8px;
-        border-left: 3px solid #334155;
-        font-size: 12px;
-        color: #94A3B8;
-        transition: border-color 0.2s;
-        cursor: default;
-    }
-    .ix-trail-item:first-child {
-        border-left-color: #00D4FF;
-        color: #E2E8F0;
-        background: #1E293B;
-    }
-    .ix-trail-query {
-        font-size: 12px; color: #E2E8F0;
-        white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
-        max-width: 180px;
-    }
-    .ix-trail-meta {
-        font-size: 10px; color: #475569;
-        font-family: 'DM Mono', monospace;
-        margin-top: 2px;
-    }
-    .ix-followup-badge {
-        display: inline-block;
-        background: #7C3AED22;
-        color: #7C3AED;
-        border: 1px solid #7C3AED44;
-        font-size: 9px; font-weight: 700;
-        padding: 1px 6px; border-radius: 4px;
-        margin-left: 6px;
-        vertical-align: middle;
-        text-transform: uppercase; letter-spacing: 0.06em;
-    }
-
-    /* ── Metric pills ── */
-    .ix-metric-strip {
-        display: flex; gap: 8px; flex-wrap: wrap;
-        margin-bottom: 1rem;
-    }
-    .ix-metric-pill {
-        padding: 5px 14px;
-        border-radius: 20px;
-        font-size: 12px; font-weight: 500;
-        background: #1E293B;
-        border: 1px solid #334155;
-        color: #94A3B8;
-        cursor: pointer;
-        transition: all 0.15s;
-        white-space: nowrap;
-    }
-    .ix-metric-pill.active {
-        background: #00D4FF18;
-        border-color: #00D4FF55;
-        color: #00D4FF;
-    }
-
-    /* ── KPI row ── */
-    .ix-kpi-row {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
-        gap: 12px;
-        margin-bottom: 1.5rem;
-    }
-    .ix-kpi-card {
-        background: #1E293B;
-        border: 1px solid #334155;
-        border-radius: 12px;
-        padding: 14px 16px;
-        position: relative;
-        overflow: hidden;
-    }
-    .ix-kpi-card::before {
-        content: '';
-        position: absolute;
-        top: 0; left: 0; right: 0;
-        height: 2px;
-    }
-    .ix-kpi-card.danger::before  { background: #EF4444; }
-    .ix-kpi-card.warning::before { background: #F97316; }
-    .ix-kpi-card.primary::before { background: #00D4FF; }
-    .ix-kpi-card.success::before { background: #10B981; }
-    .ix-kpi-label {
-        font-size: 11px; color: #64748B;
-        font-weight: 500; text-transform: uppercase;
-        letter-spacing: 0.07em; margin-bottom: 6px;
-    }
-    .ix-kpi-value {
-        font-size: 22px; font-weight: 700;
-        line-height: 1;
-    }
-    .ix-kpi-value.danger  { color: #EF4444; }
-    .ix-kpi-value.warning { color: #F97316; }
-    .ix-kpi-value.primary { color: #00D4FF; }
-    .ix-kpi-value.success { color: #10B981; }
-    .ix-kpi-sub {
-        font-size: 11px; color: #475569;
-        margin-top: 4px;
-    }
-
-    /* ── Confidence bar ── */
-    .ix-confidence {
-        display: flex; align-items: center;
-        gap: 10px; margin-top: 0.7rem;
-    }
-    .ix-confidence-label {
-        font-size: 10px; color: #475569;
-        text-transform: uppercase; letter-spacing: 0.08em;
-        min-width: 70px;
-    }
-    .ix-confidence-track {
-        flex: 1; height: 4px;
-        background: #1E293B; border-radius: 2px;
-        overflow: hidden;
-    }
-    .ix-confidence-fill {
-        height: 100%; border-radius: 2px;
-        animation: growWidth 0.6s ease-out forwards;
-    }
-    @keyframes growWidth {
-        from { width: 0%; }
-    }
-    .ix-confidence-pct {
-        font-size: 10px; font-weight: 600;
-        font-family: 'DM Mono', monospace;
-        min-width: 32px; text-align: right;
-    }
-
-    /* ── Insight highlight ── */
-    .ix-insight {
-        background: linear-gradient(135deg, #00D4FF08, #7C3AED08);
-        border: 1px solid #334155;
-        border-left: 3px solid #00D4FF;
-        border-radius: 0 10px 10px 0;
-        padding: 10px 14px;
-        margin: 0.8rem 0;
-        font-size: 13px;
-        color: #CBD5E1;
-        line-height: 1.6;
-    }
-
-    /* ── Section divider ── */
-    .ix-divider {
-        height: 1px;
-        background: linear-gradient(90deg, transparent, #334155, transparent);
-        margin: 1rem 0;
-    }
-
-    /* ── Winner badge ── */
-    .ix-winner-badge {
-        display: inline-flex; align-items: center; gap: 5px;
-        background: #EF444415; border: 1px solid #EF444433;
-        color: #EF4444; border-radius: 6px;
-        padding: 3px 10px; font-size: 11px; font-weight: 600;
-    }
-
-    /* ── Empty state ── */
-    .ix-empty {
-        text-align: center;
-        padding: 3rem 2rem;
-        color: #475569;
-    }
-    .ix-empty-icon { font-size: 2.5rem; margin-bottom: 0.8rem; }
-    .ix-empty-title { font-size: 16px; font-weight: 600; color: #64748B; }
-    .ix-empty-sub   { font-size: 13px; margin-top: 0.3rem; }
-
-    </style>
-    """, unsafe_allow_html=True)
+    # Emitted on every rerun: Streamlit drops elements a rerun doesn't repeat,
+    # so a once-per-session guard would leave later reruns unstyled.
+    _emit(_CSS_HTML)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+#  TEMPLATES
+# ══════════════════════════════════════════════════════════════════════════
+
+# Sources shared by both backends; the .html names switch autoescape on, so
+# user queries / answer text are escaped rather than interpolated raw
+_MESSAGE_SRC = """
+    <div class="ix-message">
+        <div class="ix-message-header">
+            <div class="ix-bot-avatar">IX</div>
+            <span class="ix-bot-name">InsightX</span>
+            {% if is_followup %}
+            <span class="ix-followup-badge">↩ follow-up</span>
+            {% endif %}
+        </div>
+        <div class="ix-message-body">{{ text }}</div>
+        {% if insight %}
+        <div class="ix-insight">💡 {{ insight }}</div>
+        {% endif %}
+        {% if pct is not none %}
+        <div class="ix-confidence">
+            <span class="ix-confidence-label">Confidence: {{ conf_text }}</span>
+            <div class="ix-confidence-track">
+                <div class="ix-confidence-fill" style="width:{{ pct }}%; background:{{ color }};"></div>
+            </div>
+            <span class="ix-confidence-pct" style="color:{{ color }};">{{ pct }}%</span>
+        </div>
+        {% endif %}
+    </div>
+"""
+
+_COMPARE_SRC = (
+    '<div style="display:flex;align-items:center;gap:8px;flex-wrap:wrap;'
+    'margin-bottom:12px;padding:10px 14px;background:#0F172A;'
+    'border-radius:10px;border:1px solid #334155">'
+    '<span style="font-size:10px;font-weight:700;color:#64748B;'
+    'text-transform:uppercase;letter-spacing:.08em;margin-right:4px">'
+    '{{ metric_label }}</span>'
+    '{% for seg, c, border, bg in pills %}'
+    '<span style="color:{{ c }};border:1.5px solid {{ border }};background:{{ bg }};'
+    'border-radius:20px;padding:4px 14px;font-size:12px;'
+    'font-weight:700;white-space:nowrap">{{ seg }}</span>'
+    '{% if not loop.last %}'
+    '<span style="color:#475569;font-size:11px;'
+    'font-weight:700;margin:0 4px">vs</span>'
+    '{% endif %}'
+    '{% endfor %}'
+    '</div>'
+)
+
+_TRAIL_SRC = """
+    <p><strong>Query History</strong></p>
+    <div class="ix-trail">
+    {% for item, filters_str in rows %}
+        <div class="ix-trail-item">
+            <div class="ix-trail-query">{{ item.query }}{% if item.followup %}<span class="ix-followup-badge">↩</span>{% endif %}</div>
+            <div class="ix-trail-meta">{{ item.metric }} · {{ item.intent }} · {{ item.group_by }}{{ filters_str }}</div>
+        </div>
+    {% endfor %}
+    </div>
+"""
+
+_KPI_CARD_SRC = """
+        <div class="ix-kpi-card {{ variant }}">
+            <div class="ix-kpi-label">{{ label }}</div>
+            <div class="ix-kpi-value {{ variant }}">{{ value }}</div>
+            <div class="ix-kpi-sub">{{ sub }}</div>
+        </div>"""
+
+# One card template per known variant with the class baked in; anything else
+# goes through the generic kpi_card.html
+_KPI_VARIANTS   = ("primary", "danger", "warning", "success")
+_KPI_CARD_NAMES = {v: f"kpi_card_{v}.html" for v in _KPI_VARIANTS}
+
+_TEMPLATES = {
+    "message.html":  _MESSAGE_SRC,
+    "compare.html":  _COMPARE_SRC,
+    "trail.html":    _TRAIL_SRC,
+    "kpi_card.html": _KPI_CARD_SRC,
+    **{name: _KPI_CARD_SRC.replace("{{ variant }}", v) for v, name in _KPI_CARD_NAMES.items()},
+}
+
+def _finalize(value):
+    # None prints as "none" in minijinja and "None" in Jinja2 — render it as
+    # empty in both so the HTML doesn't depend on which engine is installed
+    return "" if value is None else value
+
+
+if _HAS_MINIJINJA:
+    _env = minijinja.Environment(
+        templates     = _TEMPLATES,
+        trim_blocks   = True,
+        lstrip_blocks = True,
+        finalizer     = _finalize,
+    )
+    _render = _env.render_template
+else:
+    _env = jinja2.Environment(
+        loader        = jinja2.DictLoader(_TEMPLATES),
+        finalize      = _finalize,
+        autoescape    = True,
+        auto_reload   = False,
+        trim_blocks   = True,
+        lstrip_blocks = True,
+    )
+    _compiled = {name: _env.get_template(name) for name in _TEMPLATES}
+
+    def _render(name: str, **ctx) -> str:
+        return _compiled[name].render(**ctx)
+
+
+def _prewarm():
+    """Render every template once at import so the first rerun skips compiling."""
+    try:
+        _render("message.html", text="", insight=None, is_followup=False,
+                pct=None, color=None, conf_text=None)
+        _render("compare.html", pills=(), metric_label="")
+        _render("trail.html", rows=())
+        for name in ("kpi_card.html", *_KPI_CARD_NAMES.values()):
+            _render(name, label="", value="", sub="", variant="")
+    except Exception:
+        # Warm-up only — a failure here resurfaces on the real render
+        pass
+
+
+_prewarm()
+
+
+# The few builders still written as f-strings escape their inputs with one
+# str.translate pass — cheaper than html.escape on short labels
+_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def _e(s) -> str:
+    return "" if s is None else str(s).translate(_ESC)
+
+
+# ══════════════════════════════════════════════════════════════════════════
+#  RECORDS
+# ══════════════════════════════════════════════════════════════════════════
+
+class KPI(NamedTuple):
+    label:   str
+    value:   str
+    sub:     str = ""
+    variant: str = "primary"
+
+
+class TrailItem(NamedTuple):
+    query:    str
+    metric:   str
+    intent:   str
+    group_by: str
+    filters:  dict
+    followup: bool = False
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  COMPONENTS
 # ══════════════════════════════════════════════════════════════════════════
 
+_MSG_CACHE_KEY  = "_msg_html_cache"
+_MSG_CACHE_SIZE = 100
+
+
+def _conf_bucket(pct: int) -> tuple[str, str]:
+    """Confidence percentage → (label, colour)."""
+    return (
+        ("HIGH",   "#10B981") if pct >= 80 else
+        ("MEDIUM", "#F97316") if pct >= 50 else
+        ("LOW",    "#EF4444")
+    )
+
+
 def render_chat_message(
     text: str,
     confidence: Optional[float] = None,
@@ -309,39 +274,60 @@ def render_chat_message(
     is_followup: bool = False,
 ):
     """Render a polished AI response card."""
-    followup_badge = '<span class="ix-followup-badge">↩ follow-up</span>' if is_followup else ""
-
-    conf_html = ""
+    # Per-session LRU: earlier messages in the chat are re-emitted unchanged on
+    # every rerun, so only the newest one is actually built
+    key   = (text, confidence, insight, is_followup)
+    cache = st.session_state.setdefault(_MSG_CACHE_KEY, OrderedDict())
+    html  = cache.get(key)
+    if html is None:
+        html = cache[key] = _build_message_html(*key)
+        if len(cache) > _MSG_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    _emit(html)
+
+
+def _build_message_html(
+    text: str,
+    confidence: Optional[float],
+    insight: Optional[str],
+    is_followup: bool,
+) -> str:
+    pct = color = conf_text = None
     if confidence is not None:
-        pct       = int(confidence * 100)
-        color     = "#10B981" if pct >= 80 else "#F97316" if pct >= 50 else "#EF4444"
-        conf_text = "HIGH" if pct >= 80 else "MEDIUM" if pct >= 50 else "LOW"
-        conf_html = f"""
-        <div class="ix-confidence">
-            <span class="ix-confidence-label">Confidence: {conf_text}</span>
-            <div class="ix-confidence-track">
-                <div class="ix-confidence-fill" style="width:{pct}%; background:{color};"></div>
-            </div>
-            <span class="ix-confidence-pct" style="color:{color};">{pct}%</span>
-        </div>
-        """
+        pct              = int(confidence * 100)
+        conf_text, color = _conf_bucket(pct)
+
+    return _render(
+        "message.html",
+        text        = text,
+        insight     = insight,
+        is_followup = is_followup,
+        pct         = pct,
+        color       = color,
+        conf_text   = conf_text,
+    )
 
-    insight_html = ""
-    if insight:
-        insight_html = f'<div class="ix-insight">💡 {insight}</div>'
 
-    st.markdown(f"""
-    <div class="ix-message">
-        <div class="ix-message-header">
-            <div class="ix-bot-avatar">IX</div>
-            <span class="ix-bot-name">InsightX</span>
-            {followup_badge}
-        </div>
-        <div class="ix-message-body">{text}</div>
-        {insight_html}
-        {conf_html}
-    </div>
-    """, unsafe_allow_html=True)
+_DEFAULT_COMPARE_COLORS = (
+    "#00D4FF", "#7C3AED", "#F59E0B",
+    "#10B981", "#EF4444", "#F97316",
+)
+
+# colour → (border, background) tints, precomputed for the fixed palette
+_COMPARE_STYLES = {c: (f"{c}55", f"{c}18") for c in _DEFAULT_COMPARE_COLORS}
+
+
+@lru_cache(maxsize=256)
+def _build_compare_html(segments: tuple, metric_label: str, colors: tuple) -> str:
+    n     = len(colors)
+    pills = []
+    for i, seg in enumerate(segments):
+        c = colors[i % n]
+        border, bg = _COMPARE_STYLES.get(c) or (f"{c}55", f"{c}18")
+        pills.append((seg, c, border, bg))
+    return _render("compare.html", pills=pills, metric_label=metric_label)
 
 
 def render_comparison_header(
@@ -352,70 +338,53 @@ def render_comparison_header(
     """
     Render a visual 'A vs B vs C' pill header — pure inline styles only.
     """
-    default_colors = [
-        "#00D4FF", "#7C3AED", "#F59E0B",
-        "#10B981", "#EF4444", "#F97316",
-    ]
-    colors = colors or default_colors
+    _emit(_compare_html(segments, metric_label, colors))
 
-    pills_html = ""
-    for i, seg in enumerate(segments):
-        c = colors[i % len(colors)]
-        pills_html += (
-            f'<span style="color:{c};border:1.5px solid {c}55;background:{c}18;'
-            f'border-radius:20px;padding:4px 14px;font-size:12px;'
-            f'font-weight:700;white-space:nowrap">{seg}</span>'
-        )
-        if i < len(segments) - 1:
-            pills_html += (
-                '<span style="color:#475569;font-size:11px;'
-                'font-weight:700;margin:0 4px">vs</span>'
-            )
-
-    st.markdown(
-        f'<div style="display:flex;align-items:center;gap:8px;flex-wrap:wrap;'
-        f'margin-bottom:12px;padding:10px 14px;background:#0F172A;'
-        f'border-radius:10px;border:1px solid #334155">'
-        f'<span style="font-size:10px;font-weight:700;color:#64748B;'
-        f'text-transform:uppercase;letter-spacing:.08em;margin-right:4px">'
-        f'{metric_label}</span>'
-        f'{pills_html}'
-        f'</div>',
-        unsafe_allow_html=True,
-    )
 
+def _compare_html(segments: List[str], metric_label: str, colors: Optional[List[str]]) -> str:
+    colors = tuple(colors) if colors else _DEFAULT_COMPARE_COLORS
+    return _build_compare_html(tuple(segments), metric_label, colors)
 
-def render_context_trail(history: List[Dict]):
+
+def render_context_trail(history: List[Union[TrailItem, Dict]]):
     """
     Render the query breadcrumb in the sidebar.
-    history: list from ContextMemory.get_history_display()
+    history: list from ContextMemory.get_history_display(), or TrailItem records
     """
+    # Newest first, so the head is the latest 8 (first-child = active in CSS)
+    history = history[:8]
     if not history:
-        st.markdown("""
+        _emit("""
         <div class="ix-empty">
             <div class="ix-empty-icon">🔍</div>
             <div class="ix-empty-title">No queries yet</div>
             <div class="ix-empty-sub">Your query history will appear here</div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         return
 
-    st.markdown("**Query History**", unsafe_allow_html=False)
-    for item in history[:8]:
-        followup_badge = '<span class="ix-followup-badge">↩</span>' if item.get("followup") else ""
-        filters_str = ""
-        if item.get("filters"):
-            filters_str = " · " + ", ".join(f"{k}={v}" for k,v in item["filters"].items())
-
-        st.markdown(f"""
-        <div class="ix-trail-item">
-            <div class="ix-trail-query">{item['query']}{followup_badge}</div>
-            <div class="ix-trail-meta">{item['metric']} · {item['intent']} · {item['group_by']}{filters_str}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # Heading and items go out as one element rather than one per item. The
+    # block is re-emitted each rerun instead of updated through an st.empty()
+    # kept in session_state: placeholders belong to the run that created them,
+    # and Streamlit drops whatever a rerun does not emit again.
+    rows = []
+    for item in history:
+        if isinstance(item, TrailItem):
+            item = item._asdict()
+        filters = item.get("filters")
+        rows.append((item, " · " + ", ".join(f"{k}={v}" for k, v in filters.items()) if filters else ""))
+    _emit(_render("trail.html", rows=rows))
+
+
+@lru_cache(maxsize=256)
+def _build_kpi_html(kpis: tuple[KPI, ...]) -> str:
+    cards = []
+    for kpi in kpis:
+        cards.append(_render(_KPI_CARD_NAMES.get(kpi.variant, "kpi_card.html"), **kpi._asdict()))
+    return f'<div class="ix-kpi-row">{"".join(cards)}\n    </div>'
 
 
-def render_kpi_row(kpis: List[Dict]):
+def render_kpi_row(kpis: List[Union[KPI, Dict]]):
     """
     Render a horizontal KPI strip at the top of results.
 
@@ -423,48 +392,94 @@ def render_kpi_row(kpis: List[Dict]):
         {"label": "Fraud Rate", "value": "0.21%", "sub": "Overall", "variant": "danger"},
         {"label": "Transactions", "value": "250K",  "sub": "2024",   "variant": "primary"},
     ]
+
+    KPI records work as well: KPI("Fraud Rate", "0.21%", "Overall", "danger").
     """
-    cards_html = ""
-    for kpi in kpis:
-        v = kpi.get("variant", "primary")
-        cards_html += f"""
-        <div class="ix-kpi-card {v}">
-            <div class="ix-kpi-label">{kpi['label']}</div>
-            <div class="ix-kpi-value {v}">{kpi['value']}</div>
-            <div class="ix-kpi-sub">{kpi.get('sub','')}</div>
-        </div>
-        """
-    st.markdown(f'<div class="ix-kpi-row">{cards_html}</div>', unsafe_allow_html=True)
+    _emit(_kpi_html(kpis))
 
 
-def render_winner_badge(label: str, value: str, metric_label: str):
-    """Show a 'highest risk: Web at 0.21%' type badge."""
-    st.markdown(f"""
+def _as_kpi(kpi: Union[KPI, Dict]) -> KPI:
+    if isinstance(kpi, KPI):
+        return kpi
+    return KPI(kpi["label"], kpi["value"], kpi.get("sub", ""), kpi.get("variant", "primary"))
+
+
+def _kpi_html(kpis: List[Union[KPI, Dict]]) -> str:
+    # KPI tuples are hashable as-is, so they double as the lru_cache key
+    return _build_kpi_html(tuple(map(_as_kpi, kpis)))
+
+
+def _join_html(*fragments: Optional[str]) -> str:
+    # Fragments are stripped so no blank line sneaks in between them — on the
+    # st.markdown fallback a blank line would end the HTML block early
+    return "".join(f.strip() for f in fragments if f)
+
+
+def render_result_block(
+    kpis: Optional[List[Union[KPI, Dict]]] = None,
+    segments: Optional[List[str]] = None,
+    metric_label: str = "",
+    message: Optional[str] = None,
+    confidence: Optional[float] = None,
+    insight: Optional[str] = None,
+    is_followup: bool = False,
+    colors: Optional[List[str]] = None,
+):
+    """
+    Render KPI row, comparison header and chat message as one element
+    instead of three. Any part left as None is skipped.
+    """
+    _emit(_join_html(
+        '<div class="ix-result-block">',
+        _kpi_html(kpis) if kpis else None,
+        _compare_html(segments, metric_label, colors) if segments else None,
+        _build_message_html(message, confidence, insight, is_followup) if message is not None else None,
+        "</div>",
+    ))
+
+
+@lru_cache(maxsize=256)
+def _build_winner_html(label: str, value: str, metric_label: str) -> str:
+    return f"""
     <div class="ix-winner-badge">
-        ⚠ Highest {metric_label}: <strong style="margin-left:4px;">{label}</strong>
-        <span style="color:#EF4444aa; margin-left:4px;">at {value}</span>
+        ⚠ Highest {_e(metric_label)}: <strong style="margin-left:4px;">{_e(label)}</strong>
+        <span style="color:#EF4444aa; margin-left:4px;">at {_e(value)}</span>
     </div>
-    """, unsafe_allow_html=True)
+    """
 
 
-def render_empty_state(message: str = "Ask me anything about UPI fraud data"):
-    """Centered empty state for fresh chat."""
-    st.markdown(f"""
+def render_winner_badge(label: str, value: str, metric_label: str):
+    """Show a 'highest risk: Web at 0.21%' type badge."""
+    _emit(_build_winner_html(label, value, metric_label))
+
+
+@lru_cache(maxsize=256)
+def _build_empty_html(message: str) -> str:
+    return f"""
     <div class="ix-empty">
         <div class="ix-empty-icon">⚡</div>
         <div class="ix-empty-title">InsightX BI</div>
-        <div class="ix-empty-sub">{message}</div>
+        <div class="ix-empty-sub">{_e(message)}</div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def render_empty_state(message: str = "Ask me anything about UPI fraud data"):
+    """Centered empty state for fresh chat."""
+    _emit(_build_empty_html(message))
 
 
 def render_divider():
-    st.markdown('<div class="ix-divider"></div>', unsafe_allow_html=True)
+    _emit('<div class="ix-divider"></div>')
 
 
-def render_section_label(text: str):
-    st.markdown(
+@lru_cache(maxsize=256)
+def _build_section_label_html(text: str) -> str:
+    return (
         f'<div style="font-size:11px;font-weight:600;color:#475569;text-transform:uppercase;'
-        f'letter-spacing:.08em;margin:.8rem 0 .4rem;">{text}</div>',
-        unsafe_allow_html=True
+        f'letter-spacing:.08em;margin:.8rem 0 .4rem;">{_e(text)}</div>'
     )
+
+
+def render_section_label(text: str):
+    _emit(_build_section_label_html(text))